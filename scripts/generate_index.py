@@ -5,20 +5,107 @@ Scans wheels directory and creates HTML index for GitHub Pages.
 """
 
 import argparse
+import functools
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from html import escape
 from pathlib import Path
-from typing import Dict, Iterable, Mapping, Sequence, Tuple
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+_NORMALIZE_TABLE = str.maketrans("_.", "--")
+_BUILD_TAG_CHARS = frozenset(
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz."
+)
+_HTML_SPECIAL_CHARS = frozenset("&<>\"'")
+_PARALLEL_WRITE_THRESHOLD = 5
+
+# Index pages are rendered straight to UTF-8 bytes so they can be written
+# without a separate encoding pass.
+_HTML_HEADER_TEMPLATE = (
+    b"<!DOCTYPE html>\n<html>\n<head>\n"
+    b"  <title>%(title)s</title>\n"
+    b"</head>\n<body>\n"
+    b"  <h1>%(title)s</h1>\n"
+)
+_HTML_FOOTER = b"</body>\n</html>"
+_ROOT_INDEX_HEADER = _HTML_HEADER_TEMPLATE % {b"title": b"Simple Index"}
+
+WheelParts = Tuple[str, str, Optional[str], str, str, str]
+
+
+@functools.lru_cache(maxsize=None)
+def _wheel_pattern() -> "re.Pattern[str]":
+    """
+    Compile the PEP 427 filename pattern on first use.
+
+    Only filenames the split-based fast path cannot handle need it.
+    """
+    return re.compile(
+        r"^(?P<name>.+?)-(?P<version>.+?)"
+        r"(?:-(?P<build>\d[0-9A-Za-z\.]*))?"
+        r"-(?P<python>.+?)-(?P<abi>.+?)-(?P<platform>.+?)\.whl$"
+    )
 
 
+@functools.lru_cache(maxsize=1024)
 def normalize_package_name(name: str) -> str:
     """
     Normalize package names according to PEP 503 by:
     - replacing runs of -, _, or . with a single dash
     - lowercasing the result
     """
-    return re.sub(r"[-_.]+", "-", name).lower()
+    normalized = name.translate(_NORMALIZE_TABLE).lower()
+    while "--" in normalized:
+        normalized = normalized.replace("--", "-")
+    return normalized
+
+
+def _split_wheel_filename(filename: str) -> Optional[WheelParts]:
+    """
+    Split a wheel filename into (name, version, build, python, abi, platform).
+
+    Well-formed names with five or six dash-separated fields are split with
+    str.split; anything else falls back to the regex so edge cases resolve
+    exactly as the regex does. Returns None if the filename is not a wheel.
+    """
+    if filename.endswith(".whl") and "\n" not in filename:
+        fields = filename[:-4].split("-")
+        if all(fields):
+            if len(fields) == 5:
+                name, version, python, abi, platform = fields
+                return name, version, None, python, abi, platform
+            if (
+                len(fields) == 6
+                and fields[2][0].isdecimal()
+                and _BUILD_TAG_CHARS.issuperset(fields[2][1:])
+            ):
+                name, version, build, python, abi, platform = fields
+                return name, version, build, python, abi, platform
+
+    match = _wheel_pattern().match(filename)
+    if not match:
+        return None
+
+    return match.group("name", "version", "build", "python", "abi", "platform")
+
+
+def _parse_wheel_parts(filename: str) -> WheelParts:
+    """Split a wheel filename, raising ValueError if it is not a valid wheel."""
+    parts = _split_wheel_filename(filename)
+
+    # PEP 427 filenames never contain these, and rejecting them here lets the
+    # index writers emit filenames without HTML escaping.
+    if parts is None or not _HTML_SPECIAL_CHARS.isdisjoint(filename):
+        raise ValueError(f"Invalid wheel filename: {filename}")
+
+    return parts
+
+
+def _parse_wheel_name(filename: str) -> str:
+    """Return only the normalized project name from a wheel filename."""
+    return normalize_package_name(_parse_wheel_parts(filename)[0])
 
 
 def parse_wheel_filename(filename: str) -> Dict[str, str]:
@@ -35,32 +122,41 @@ def parse_wheel_filename(filename: str) -> Dict[str, str]:
         'platform': 'linux_x86_64'
     }
     """
-    pattern = (
-        r"^(?P<name>.+?)-(?P<version>.+?)"
-        r"(?:-(?P<build>\d[0-9A-Za-z\.]*))?"
-        r"-(?P<python>.+?)-(?P<abi>.+?)-(?P<platform>.+?)\.whl$"
-    )
-    match = re.match(pattern, filename)
-
-    if not match:
-        raise ValueError(f"Invalid wheel filename: {filename}")
-
-    parts = match.groupdict()
-    normalized_name = normalize_package_name(parts["name"])
+    name, version, build, python, abi, platform = _parse_wheel_parts(filename)
 
     return {
-        "name": normalized_name,
-        "version": parts["version"],
-        "build": parts.get("build"),
-        "python": parts["python"],
-        "abi": parts["abi"],
-        "platform": parts["platform"],
+        "name": normalize_package_name(name),
+        "version": version,
+        "build": build,
+        "python": python,
+        "abi": abi,
+        "platform": platform,
     }
 
 
+def _render_package_index(
+    package_name: str,
+    sorted_wheels: Sequence[str],
+    base_url: str,
+) -> bytes:
+    """
+    Render a package index from wheel filenames that are already sorted and
+    either validated by _parse_wheel_parts or HTML-escaped.
+    """
+    # The caller-supplied base URL is the only unchecked input here.
+    normalized_base = escape(base_url.rstrip("/"))
+    rows = "".join(
+        f'  <a href="{normalized_base}/{wheel}">{wheel}</a><br/>\n'
+        for wheel in sorted_wheels
+    ).encode("utf-8")
+
+    title = f"Links for {package_name}".encode("utf-8")
+    return _HTML_HEADER_TEMPLATE % {b"title": title} + rows + _HTML_FOOTER
+
+
 def generate_package_index(
     package_name: str,
-    wheels: Sequence[str],
+    wheels: Iterable[str],
     base_url: str,
 ) -> str:
     """
@@ -68,36 +164,25 @@ def generate_package_index(
 
     Args:
         package_name: Normalized package name (e.g., 'flash-attn')
-        wheels: Iterable of wheel filenames for this package
+        wheels: Iterable of wheel filenames for this package, in any order
         base_url: Base URL for wheel downloads
 
     Returns:
         HTML content for package index
     """
-    normalized_base = base_url.rstrip("/")
-
-    html = [
-        "<!DOCTYPE html>",
-        "<html>",
-        "<head>",
-        f"  <title>Links for {package_name}</title>",
-        "</head>",
-        "<body>",
-        f"  <h1>Links for {package_name}</h1>",
-    ]
-
-    for wheel in sorted(wheels):
-        url = f"{normalized_base}/{wheel}"
-        html.append(f'  <a href="{escape(url)}">{escape(wheel)}</a><br/>')
-
-    html.extend(
-        [
-            "</body>",
-            "</html>",
-        ]
-    )
+    # Unlike generate_indexes, external callers pass unvalidated filenames.
+    escaped_wheels = [escape(wheel) for wheel in sorted(wheels)]
+    html = _render_package_index(package_name, escaped_wheels, base_url)
+    return html.decode("utf-8")
+
 
-    return "\n".join(html)
+def _render_root_index(sorted_packages: Sequence[str]) -> bytes:
+    """Render the root index from normalized, unique, sorted package names."""
+    rows = "".join(
+        f'  <a href="{package}/">{package}</a><br/>\n' for package in sorted_packages
+    ).encode("utf-8")
+
+    return _ROOT_INDEX_HEADER + rows + _HTML_FOOTER
 
 
 def generate_root_index(packages: Iterable[str]) -> str:
@@ -114,27 +199,24 @@ def generate_root_index(packages: Iterable[str]) -> str:
         {normalize_package_name(package) for package in packages}
     )
 
-    html = [
-        "<!DOCTYPE html>",
-        "<html>",
-        "<head>",
-        "  <title>Simple Index</title>",
-        "</head>",
-        "<body>",
-        "  <h1>Simple Index</h1>",
-    ]
-
-    for package in normalized_packages:
-        html.append(f'  <a href="{package}/">{package}</a><br/>')
-
-    html.extend(
-        [
-            "</body>",
-            "</html>",
-        ]
-    )
+    return _render_root_index(normalized_packages).decode("utf-8")
 
-    return "\n".join(html)
+
+def _write_files(files: Sequence[Tuple[Path, bytes]]) -> None:
+    """
+    Write each payload to its path.
+
+    Writes are latency-bound and release the GIL, so larger batches are
+    spread over a thread pool; small batches are not worth the startup cost.
+    """
+    if len(files) <= _PARALLEL_WRITE_THRESHOLD:
+        for path, payload in files:
+            path.write_bytes(payload)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(32, len(files))) as executor:
+        # Consume the results so any write error is re-raised here.
+        list(executor.map(lambda item: item[0].write_bytes(item[1]), files))
 
 
 def generate_indexes(
@@ -145,56 +227,87 @@ def generate_indexes(
     """
     Generate PEP 503 indexes for wheels in a directory.
 
-    Returns mapping with package names and wheel filenames for summary/testing.
+    Returns mapping with package names and the sorted valid wheel filenames
+    for summary/testing.
     """
     if not wheels_dir.exists():
         raise FileNotFoundError(f"Wheels directory not found: {wheels_dir}")
 
-    wheel_files = tuple(
-        wheel
-        for wheel in sorted(wheels_dir.glob("*.whl"))
-        if wheel.is_file()
-    )
+    # scandir reuses the dirent file type, avoiding a stat() per entry.
+    with os.scandir(wheels_dir) as entries:
+        wheel_files = [
+            entry.name
+            for entry in entries
+            if entry.name.endswith(".whl") and entry.is_file()
+        ]
+
+    # This is the only sort of wheel filenames. str ordering is by code point,
+    # never by locale, so generated indexes are identical across environments.
+    wheel_files.sort()
 
-    valid_wheels: Tuple[str, ...] = ()
-    packages: Dict[str, Tuple[str, ...]] = {}
+    package_wheels: Dict[str, List[str]] = {}
+    warnings: List[str] = []
 
-    for wheel_path in wheel_files:
+    # wheel_files is already sorted, so appending keeps every list sorted.
+    for wheel_name in wheel_files:
         try:
-            info = parse_wheel_filename(wheel_path.name)
-            package_name = info["name"]
-            current_wheels = packages.get(package_name, ())
-            packages[package_name] = tuple(sorted(current_wheels + (wheel_path.name,)))
-            valid_wheels = tuple(sorted(valid_wheels + (wheel_path.name,)))
+            package_name = _parse_wheel_name(wheel_name)
+            package_wheels.setdefault(package_name, []).append(wheel_name)
         except ValueError as error:
-            print(f"Warning: {error}", file=sys.stderr)
+            warnings.append(f"Warning: {error}\n")
             continue
 
+    if warnings:
+        sys.stderr.write("".join(warnings))
+
+    packages: Dict[str, Tuple[str, ...]] = {
+        name: tuple(wheels) for name, wheels in package_wheels.items()
+    }
+
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    index_files: List[Tuple[Path, bytes]] = []
+
+    # output_dir exists now, so package directories need no parent walk.
     for package_name, wheels in packages.items():
         package_dir = output_dir / package_name
-        package_dir.mkdir(parents=True, exist_ok=True)
+        package_dir.mkdir(exist_ok=True)
+
+        html = _render_package_index(package_name, wheels, base_url)
+        index_files.append((package_dir / "index.html", html))
 
-        html = generate_package_index(package_name, wheels, base_url)
-        (package_dir / "index.html").write_text(html, encoding="utf-8")
+    # Keys come from _parse_wheel_name, so they are already normalized.
+    root_html = _render_root_index(sorted(packages))
+    index_files.append((output_dir / "index.html", root_html))
 
-    root_html = generate_root_index(packages.keys())
-    (output_dir / "index.html").write_text(root_html, encoding="utf-8")
+    _write_files(index_files)
 
     return {
         "packages": packages,
-        "wheel_files": valid_wheels,
+        # Each package's run is already sorted, so this merge is near-linear.
+        "wheel_files": tuple(
+            sorted(wheel for wheels in packages.values() for wheel in wheels)
+        ),
     }
 
 
+def _existing_dir(value: str) -> Path:
+    """argparse type that only accepts an existing directory."""
+    path = Path(value)
+    if not path.exists():
+        raise argparse.ArgumentTypeError(f"Wheels directory not found: {path}")
+    if not path.is_dir():
+        raise argparse.ArgumentTypeError(f"Wheels path is not a directory: {path}")
+    return path
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Generate PyPI-compatible index from wheels"
     )
     parser.add_argument(
         "--wheels-dir",
-        type=Path,
+        type=_existing_dir,
         default=Path("wheels"),
         help="Directory containing wheel files",
     )
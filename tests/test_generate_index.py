@@ -8,10 +8,18 @@ from scripts.generate_index import (
     generate_package_index,
     generate_root_index,
     generate_indexes,
+    normalize_package_name,
     parse_wheel_filename,
 )
 
 
+class NormalizePackageNameTests(unittest.TestCase):
+    def test_collapses_separator_runs(self) -> None:
+        self.assertEqual(normalize_package_name("Flash_Attn"), "flash-attn")
+        self.assertEqual(normalize_package_name("a._-_.b"), "a-b")
+        self.assertEqual(normalize_package_name("a---b"), "a-b")
+
+
 class ParseWheelFilenameTests(unittest.TestCase):
     def test_normalizes_name_and_handles_build_tag(self) -> None:
         info = parse_wheel_filename(
@@ -34,6 +42,10 @@ class ParseWheelFilenameTests(unittest.TestCase):
         with self.assertRaises(ValueError):
             parse_wheel_filename("not-a-wheel.txt")
 
+    def test_rejects_html_special_characters(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_wheel_filename("flash<attn-2.5.0-cp312-cp312-linux_x86_64.whl")
+
 
 class GeneratePackageIndexTests(unittest.TestCase):
     def test_uses_base_url_without_double_slash(self) -> None:
@@ -51,6 +63,47 @@ class GeneratePackageIndexTests(unittest.TestCase):
         )
         self.assertTrue(html.startswith("<!DOCTYPE html>"))
 
+    def test_escapes_unvalidated_wheel_names(self) -> None:
+        html = generate_package_index(
+            package_name="x",
+            wheels=("a&b-1-py3-none-any.whl",),
+            base_url="https://example.com/releases",
+        )
+
+        self.assertIn(
+            '<a href="https://example.com/releases/a&amp;b-1-py3-none-any.whl">'
+            "a&amp;b-1-py3-none-any.whl</a>",
+            html,
+        )
+        self.assertNotIn("a&b", html)
+
+    def test_quotes_cannot_break_out_of_href(self) -> None:
+        html = generate_package_index(
+            package_name="x",
+            wheels=('a"b-1-py3-none-any.whl',),
+            base_url="https://example.com/releases",
+        )
+
+        self.assertIn(
+            'href="https://example.com/releases/a&quot;b-1-py3-none-any.whl"',
+            html,
+        )
+
+    def test_sorts_unordered_wheels(self) -> None:
+        html = generate_package_index(
+            package_name="xformers",
+            wheels=(
+                "xformers-0.0.23-cp312-cp312-linux_x86_64.whl",
+                "xformers-0.0.23-cp311-cp311-linux_x86_64.whl",
+            ),
+            base_url="https://example.com/releases",
+        )
+
+        self.assertLess(
+            html.index("xformers-0.0.23-cp311"),
+            html.index("xformers-0.0.23-cp312"),
+        )
+
 
 class GenerateIndexesTests(unittest.TestCase):
     def test_creates_root_and_package_indexes(self) -> None:
@@ -85,6 +138,69 @@ class GenerateIndexesTests(unittest.TestCase):
                 flash_index,
             )
 
+    def test_writes_indexes_for_many_packages(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            wheels_dir = tmp_path / "wheels"
+            wheels_dir.mkdir(parents=True, exist_ok=True)
+
+            package_names = tuple(f"pkg{index}" for index in range(10))
+            for name in package_names:
+                (wheels_dir / f"{name}-1.0-py3-none-any.whl").write_bytes(b"")
+
+            output_dir = tmp_path / "simple"
+            generate_indexes(
+                wheels_dir=wheels_dir,
+                output_dir=output_dir,
+                base_url="https://example.com/releases",
+            )
+
+            for name in package_names:
+                package_index = (output_dir / name / "index.html").read_text()
+                self.assertIn(f"{name}-1.0-py3-none-any.whl", package_index)
+
+    def test_wheel_files_are_sorted_across_packages(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            wheels_dir = tmp_path / "wheels"
+            wheels_dir.mkdir(parents=True, exist_ok=True)
+
+            wheel_files = (
+                "A_b-1.0-py3-none-any.whl",
+                "a-1.0-py3-none-any.whl",
+                "a_b-2.0-py3-none-any.whl",
+            )
+            for wheel in wheel_files:
+                (wheels_dir / wheel).write_bytes(b"")
+
+            summary = generate_indexes(
+                wheels_dir=wheels_dir,
+                output_dir=tmp_path / "simple",
+                base_url="https://example.com/releases",
+            )
+
+            self.assertEqual(summary["wheel_files"], wheel_files)
+
+    def test_ignores_non_wheel_entries(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            wheels_dir = tmp_path / "wheels"
+            wheels_dir.mkdir(parents=True, exist_ok=True)
+
+            wheel_name = "flash_attn-2.5.0-cp312-cp312-linux_x86_64.whl"
+            (wheels_dir / wheel_name).write_bytes(b"")
+            (wheels_dir / f"{wheel_name}.sha256").write_bytes(b"")
+            (wheels_dir / "xformers-0.0.23-cp311-cp311-linux_x86_64.whl").mkdir()
+
+            summary = generate_indexes(
+                wheels_dir=wheels_dir,
+                output_dir=tmp_path / "simple",
+                base_url="https://example.com/releases",
+            )
+
+            self.assertEqual(summary["wheel_files"], (wheel_name,))
+            self.assertEqual(list(summary["packages"]), ["flash-attn"])
+
     def test_script_runs_end_to_end(self) -> None:
         with TemporaryDirectory() as tmp_dir:
             tmp_path = Path(tmp_dir)
@@ -115,6 +231,51 @@ class GenerateIndexesTests(unittest.TestCase):
             self.assertTrue((output_dir / "index.html").exists())
             self.assertTrue((output_dir / "flash-attn" / "index.html").exists())
 
+    def test_script_rejects_missing_wheels_dir(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "scripts/generate_index.py",
+                    "--wheels-dir",
+                    str(tmp_path / "missing"),
+                    "--output-dir",
+                    str(tmp_path / "simple"),
+                    "--base-url",
+                    "https://example.com/releases",
+                ],
+                capture_output=True,
+                text=True,
+            )
+
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("Wheels directory not found", result.stderr)
+            self.assertFalse((tmp_path / "simple").exists())
+
+    def test_script_rejects_file_as_wheels_dir(self) -> None:
+        with TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir)
+            wheels_file = tmp_path / "wheels"
+            wheels_file.write_bytes(b"")
+
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    "scripts/generate_index.py",
+                    "--wheels-dir",
+                    str(wheels_file),
+                    "--base-url",
+                    "https://example.com/releases",
+                ],
+                capture_output=True,
+                text=True,
+            )
+
+            self.assertNotEqual(result.returncode, 0)
+            self.assertIn("is not a directory", result.stderr)
+
 
 if __name__ == "__main__":
     unittest.main()